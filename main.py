@@ -1,126 +1,371 @@
 import sys
 import os
+import functools
 import time
 import subprocess
 import platform
+import queue
+import shutil
 import threading
 import re
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QProgressBar, QMessageBox, QSpinBox, QGroupBox, QFormLayout)
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QThread, QProcess, pyqtSignal
+from PyQt6.QtNetwork import QTcpSocket
+
+# 高频解析用的正则，统一预编译 (均作用于 adb 原始 bytes 输出)
+# /proc/net/dev 数据行: "iface: rx_bytes rx_packets ... (共 8 列接收) tx_bytes ..."
+_NETDEV_RE = re.compile(rb'^\s*([^\s:]+):\s*(\d+)(?:\s+\d+){7}\s+(\d+)', re.M)
+# 连通性检测成功: nc 连接成功标记或 Ping 收到回包
+_PING_OK = re.compile(rb"__NC_OK__|1 received")
+# ip addr 输出中的网卡类型
+_IFACE_RE = re.compile(rb"\b(wlan|rmnet|ccmni|eth)")
+_IFACE_TYPES = {b"wlan": "Wi-Fi", b"rmnet": "移动数据", b"ccmni": "移动数据", b"eth": "有线网络"}
+
+@functools.cache
+def _bundle_path():
+    """内置资源 (adb 等) 所在目录: 打包后为 PyInstaller 解压目录，否则为当前目录"""
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS
+    return os.getcwd()
+
+@functools.cache
+def _base_path():
+    """程序所在目录 (当前 exe 同级目录)，用于保存日志"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.getcwd()
+
+@functools.cache
+def _resolve_adb_path():
+    """查找 adb 可执行文件: 优先使用内置 adb，其次 platform-tools，最后使用 PATH 中的 adb"""
+    base_path = _bundle_path()
+    adb_name = "adb.exe" if platform.system() == "Windows" else "adb"
+    
+    local_adb = os.path.join(base_path, adb_name)
+    if os.path.exists(local_adb):
+        return local_adb
+    
+    tools_adb = os.path.join(base_path, "platform-tools", adb_name)
+    if os.path.exists(tools_adb):
+        return tools_adb
+        
+    return adb_name
 
 class AdbWorker(QThread):
     """后台 ADB 管理线程"""
     device_status_signal = pyqtSignal(str, str, bool) # status_text, color, is_connected
+    detail_signal = pyqtSignal(str, str) # device_info, network_type
+    # 设备信息相关属性，统一批量读取
+    DEVICE_PROPS = ("ro.product.model", "ro.product.brand", "ro.build.version.release")
+    # 单条 shell 命令的最长等待时间 (秒)，超时视为会话卡死并重建
+    SHELL_TIMEOUT = 10
+    # 设备端连通性检测 (均限时 1 秒): 设备的 nc 支持 -z 时对 223.5.5.5:443 做 TCP 连接，否则 Ping
+    NC_HEARTBEAT_CMD = "nc -w 1 -z 223.5.5.5 443 && echo __NC_OK__"
+    PING_HEARTBEAT_CMD = "ping -c 1 -w 1 223.5.5.5"
     
     def __init__(self):
         super().__init__()
-        self.running = True
-        self.adb_path = self.find_adb()
+        # Windows 下隐藏 adb 控制台窗口的 STARTUPINFO 只需构造一次，所有子进程复用
+        self._startupinfo = None
+        if platform.system() == "Windows":
+            self._startupinfo = subprocess.STARTUPINFO()
+            self._startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        self.adb_path = _resolve_adb_path()
         self.device_id = None
-
-    def find_adb(self):
-        if getattr(sys, 'frozen', False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.getcwd()
-            
-        system = platform.system()
-        adb_name = "adb.exe" if system == "Windows" else "adb"
-        
-        local_adb = os.path.join(base_path, adb_name)
-        if os.path.exists(local_adb):
-            return local_adb
-        
-        tools_adb = os.path.join(base_path, "platform-tools", adb_name)
-        if os.path.exists(tools_adb):
-            return tools_adb
-            
-        return adb_name
+        self.tracker = None # track-devices 长连接 (QTcpSocket，在线程内创建)
+        self.retry_timer = None # 连接失败后的重连定时器
+        self._tracker_buf = b""
+        self._tracker_ready = False
+        self._announce_device = False # adb server 重连后需重新上报设备状态
+        # 常驻 adb shell 会话，避免每条命令都重新 fork adb 进程
+        self.shell_proc = None
+        self.shell_output = None # 后台读取线程写入的输出行队列
+        self.shell_lock = threading.Lock()
+        self.shell_seq = 0
+        # 设备属性在会话期间不会变化，首次读取成功后缓存
+        self._prop_cache = {}
+        self._heartbeat_cmd = None # 按设备缓存的连通性检测命令
+        self.swipe_proc = None # 设备端滑动循环
+        # NetworkMonitor 最近一次 Ping 的时间与结果，供 get_network_type 复用
+        self._last_ping_ts = 0
+        self._last_ping_ok = False
 
     def run(self):
-        """持续检测设备连接状态"""
-        while self.running:
+        """在线程事件循环中通过 adb server 的 track-devices 服务监听设备连接状态 (仅在变化时推送)"""
+        # 以下对象在本线程创建；AdbWorker 自身属于 GUI 线程，因此回调使用 DirectConnection 留在本线程执行
+        direct = Qt.ConnectionType.DirectConnection
+        self.tracker = QTcpSocket()
+        self.tracker.connected.connect(self._on_tracker_connected, direct)
+        self.tracker.readyRead.connect(self._on_tracker_ready_read, direct)
+        self.tracker.errorOccurred.connect(self._on_tracker_error, direct)
+        self.retry_timer = QTimer()
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self._connect_tracker, direct)
+
+        self._connect_tracker()
+        self.exec()
+
+        self.retry_timer.stop()
+        self.tracker.abort()
+        self.tracker = None
+        self.retry_timer = None
+
+    def _connect_tracker(self):
+        """确保 adb server 已启动，再连接其 host 服务端口"""
+        self.run_cmd(["start-server"])
+        self._tracker_buf = b""
+        self._tracker_ready = False
+        port = int(os.environ.get("ANDROID_ADB_SERVER_PORT", "5037"))
+        self.tracker.connectToHost("127.0.0.1", port)
+
+    def _on_tracker_connected(self):
+        # ADB 协议: 4 位十六进制长度 + 请求内容
+        request = b"host:track-devices"
+        self.tracker.write(b"%04x" % len(request) + request)
+
+    def _on_tracker_ready_read(self):
+        self._tracker_buf += bytes(self.tracker.readAll())
+        if not self._tracker_ready:
+            if len(self._tracker_buf) < 4: return
+            status, self._tracker_buf = self._tracker_buf[:4], self._tracker_buf[4:]
+            if status != b"OKAY":
+                self._tracker_failed(f"track-devices 请求被拒绝: {status!r}")
+                return
+            self._tracker_ready = True
+
+        # 每次设备列表变化时 server 推送一帧: 长度 + "serial\tstate\n" 列表
+        while len(self._tracker_buf) >= 4:
             try:
-                cmd = [self.adb_path, "devices"]
-                if platform.system() == "Windows":
-                     startupinfo = subprocess.STARTUPINFO()
-                     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                     result = subprocess.run(cmd, capture_output=True, text=True, startupinfo=startupinfo)
-                else:
-                     result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                output = result.stdout.strip()
-                lines = output.split('\n')[1:]
-                devices = [line.split()[0] for line in lines if line.strip() and "device" in line]
-                
-                if devices:
-                    # 如果之前没有设备，或者设备ID变了
-                    if self.device_id != devices[0]:
-                        self.device_id = devices[0]
-                        self.device_status_signal.emit(f"✅ 已连接设备: {self.device_id}", "green", True)
-                else:
-                    if self.device_id is not None:
-                        self.device_id = None
-                        self.device_status_signal.emit("⚠️ 未检测到设备，请连接手机", "red", False)
-            except Exception as e:
-                self.device_status_signal.emit(f"❌ ADB 服务异常: {str(e)}", "red", False)
-            
-            time.sleep(2)
+                length = int(self._tracker_buf[:4], 16)
+            except ValueError:
+                self._tracker_failed("track-devices 数据格式错误")
+                return
+            if len(self._tracker_buf) < 4 + length: return
+            payload = self._tracker_buf[4:4 + length].decode(errors="replace")
+            self._tracker_buf = self._tracker_buf[4 + length:]
+            devices = []
+            for line in payload.splitlines():
+                parts = line.split()
+                if len(parts) >= 2 and parts[1] == "device":
+                    devices.append(parts[0])
+            self.update_devices(devices)
+
+    def _on_tracker_error(self, error):
+        self._tracker_failed(self.tracker.errorString())
+
+    def _tracker_failed(self, reason):
+        """连接失败或中断: 上报异常，2 秒后由 QTimer 重连"""
+        self.tracker.abort()
+        # 保留当前设备 (adb 命令仍可自动拉起 server)，重连后的首帧重新上报连接状态
+        self._announce_device = True
+        self.device_status_signal.emit(f"❌ ADB 服务异常: {reason}", "red", False)
+        if not self.retry_timer.isActive():
+            self.retry_timer.start(2000)
+
+    def update_devices(self, devices):
+        """根据最新设备列表更新当前设备并发出状态信号"""
+        announce, self._announce_device = self._announce_device, False
+        if devices:
+            # 如果之前没有设备，或者设备ID变了，或者 adb server 重连后需要重新上报
+            if self.device_id != devices[0] or announce:
+                if self.device_id != devices[0]:
+                    self.close_shell()
+                    self._prop_cache.clear()
+                    self._heartbeat_cmd = None
+                    self.device_id = devices[0]
+                self.device_status_signal.emit(f"✅ 已连接设备: {self.device_id}", "green", True)
+                # 在本线程内顺序获取详细信息，避免与其他 adb 调用并发
+                self.fetch_and_emit_details()
+        else:
+            if self.device_id is not None:
+                self.close_shell()
+                self._prop_cache.clear()
+                self._heartbeat_cmd = None
+                self.device_id = None
+                self.device_status_signal.emit("⚠️ 未检测到设备，请连接手机", "red", False)
+
+    def fetch_and_emit_details(self):
+        """获取设备型号与网络类型，通过信号回传给 UI"""
+        info = self.get_device_info()
+        net_type = self.get_network_type()
+        self.detail_signal.emit(info, net_type)
 
     def stop(self):
-        self.running = False
+        # 退出线程事件循环，无需等待轮询间隔
+        self.quit()
         self.wait()
-
-    def run_cmd(self, args):
-        """同步执行ADB命令"""
+        self.close_shell()
+
+    def open_shell(self, device_id):
+        """启动常驻 adb shell 进程 (需持有 shell_lock)"""
+        cmd = [self.adb_path, "-s", device_id, "shell"]
+        self.shell_proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                           stderr=subprocess.DEVNULL, startupinfo=self._startupinfo)
+        # 由后台线程阻塞读取输出，shell_cmd 可以带超时地等待
+        self.shell_output = queue.Queue()
+        threading.Thread(target=self._read_shell, args=(self.shell_proc.stdout, self.shell_output),
+                         daemon=True).start()
+
+    @staticmethod
+    def _read_shell(stdout, output):
+        """逐行转发 shell 输出到队列，进程退出时放入 b"" 作为结束标志"""
+        for line in iter(stdout.readline, b""):
+            output.put(line)
+        output.put(b"")
+
+    def close_shell(self):
+        """关闭常驻 adb shell 进程 (设备切换/断开/退出时调用)"""
+        with self.shell_lock:
+            self._kill_shell()
+
+    def _kill_shell(self):
+        if self.shell_proc is None: return
+        try:
+            self.shell_proc.kill()
+            self.shell_proc.wait()
+        except OSError:
+            pass
+        self.shell_proc = None
+        self.shell_output = None
+
+    def shell_cmd(self, command, text=True):
+        """通过常驻 shell 执行命令，以唯一的结束标记分隔每条命令的输出"""
+        with self.shell_lock:
+            device_id = self.device_id
+            if not device_id: return None
+            try:
+                if self.shell_proc is None or self.shell_proc.poll() is not None:
+                    self.open_shell(device_id)
+                self.shell_seq += 1
+                marker = f"__END_{self.shell_seq}__"
+                # stdin 重定向到 /dev/null，防止命令吞掉后续写入的指令
+                # 标记写成 __END_""N__，shell 输出为 __END_N__；旧设备 PTY 回显的命令行不会被误匹配
+                self.shell_proc.stdin.write(
+                    f"{{ {command}; }} </dev/null; echo __END_\"\"{self.shell_seq}__\n".encode())
+                self.shell_proc.stdin.flush()
+
+                marker = marker.encode()
+                chunks = []
+                deadline = time.monotonic() + self.SHELL_TIMEOUT
+                while True:
+                    try:
+                        line = self.shell_output.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        # 命令卡住 (USB 挂起、引号不配对等)，结束会话，下次调用时重建
+                        self._kill_shell()
+                        return None
+                    if not line:
+                        # shell 进程已退出 (设备断开等)
+                        self._kill_shell()
+                        return None
+                    # 命令输出可能不以换行结尾，标记会拼接在最后一行末尾
+                    stripped = line.rstrip(b"\r\n")
+                    if stripped.endswith(marker):
+                        chunks.append(stripped[:-len(marker)])
+                        break
+                    chunks.append(line)
+                output = b"".join(chunks)
+                if not text:
+                    return output.strip()
+                return output.decode("utf-8", errors="replace").strip()
+            except OSError:
+                self._kill_shell()
+                return None
+
+    def run_cmd(self, args, text=True):
+        """同步执行ADB命令 (text=False 时返回原始 bytes)"""
         if not self.adb_path: return None
+        if args and args[0] == "shell" and len(args) > 1:
+            return self.shell_cmd(" ".join(args[1:]), text=text)
         cmd = [self.adb_path]
         if self.device_id:
             cmd.extend(["-s", self.device_id])
         cmd.extend(args)
         try:
-            if platform.system() == "Windows":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                result = subprocess.run(cmd, capture_output=True, text=True, startupinfo=startupinfo)
-            else:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.stdout.strip()
-        except:
+            result = subprocess.run(cmd, capture_output=True, startupinfo=self._startupinfo)
+            # 统一按 UTF-8 手动解码一次，避免 text=True 的 locale 解码开销 (Windows 上尤为明显)
+            output = result.stdout.strip()
+            return output.decode("utf-8", errors="replace") if text else output
+        except (subprocess.SubprocessError, OSError):
             return None
 
+    def start_swipe_loop(self):
+        """在设备端循环执行滑动 (每 2 秒一次)，避免主机侧每次滑动都启动 adb 进程
+        
+        使用 QProcess 由 GUI 线程的事件循环管理，需在 GUI 线程调用"""
+        self.stop_swipe_loop()
+        self.swipe_proc = QProcess()
+        self.swipe_proc.setStandardOutputFile(QProcess.nullDevice())
+        self.swipe_proc.setStandardErrorFile(QProcess.nullDevice())
+        self.swipe_proc.start(self.adb_path, ["-s", self.device_id, "shell",
+                              "while true; do sleep 2; input swipe 500 1500 500 500 200; done"])
+        self.swipe_proc.closeWriteChannel()
+
+    def stop_swipe_loop(self):
+        """结束设备端滑动循环"""
+        if self.swipe_proc is None: return
+        if self.swipe_proc.state() != QProcess.ProcessState.NotRunning:
+            self.swipe_proc.kill()
+            self.swipe_proc.waitForFinished(1000)
+        self.swipe_proc = None
+        # 结束主机侧 adb 进程不一定会终止设备端的 shell，需要再清理一次
+        self.run_cmd(["shell", "pkill", "-f", "'input swipe'"])
+
+    def get_props(self, keys):
+        """一次 shell 调用批量读取多个系统属性，返回 {key: value} (结果会被缓存)"""
+        missing = [key for key in keys if key not in self._prop_cache]
+        if missing:
+            script = "; echo ---; ".join(f"getprop {key}" for key in missing)
+            output = self.run_cmd(["shell", script])
+            if output is None:
+                return {key: self._prop_cache.get(key, "") for key in keys}
+            values = [v.strip() for v in output.split("---")]
+            for key, value in zip(missing, values):
+                if value:
+                    self._prop_cache[key] = value
+        return {key: self._prop_cache.get(key, "") for key in keys}
+
     def get_device_info(self):
         """获取设备型号和Android版本"""
-        model = self.run_cmd(["shell", "getprop", "ro.product.model"])
-        version = self.run_cmd(["shell", "getprop", "ro.build.version.release"])
-        return f"{model} (Android {version})"
+        props = self.get_props(self.DEVICE_PROPS)
+        return f"{props['ro.product.model']} (Android {props['ro.build.version.release']})"
+
+    def heartbeat_cmd(self):
+        """返回连通性检测命令，每台设备只检测一次 nc 是否支持 -z"""
+        if self._heartbeat_cmd is None:
+            output = self.run_cmd(["shell", "nc --help 2>&1 | grep -q -e -z && echo __NC_Z__"])
+            if output is None:
+                # 检测失败不缓存，本次先用 Ping
+                return self.PING_HEARTBEAT_CMD
+            self._heartbeat_cmd = self.NC_HEARTBEAT_CMD if "__NC_Z__" in output else self.PING_HEARTBEAT_CMD
+        return self._heartbeat_cmd
+
+    def record_ping(self, ok):
+        """记录最近一次连通性检测结果 (由 NetworkMonitor 调用)"""
+        self._last_ping_ts, self._last_ping_ok = time.time(), ok
 
     def get_network_type(self):
         """获取当前网络类型 (增强版)"""
-        # 1. 尝试直接 Ping 外网，确认是否有网
-        ping_res = self.run_cmd(["shell", "ping", "-c", "1", "-w", "1", "223.5.5.5"])
-        has_internet = ping_res and "1 received" in ping_res
-
-        # 2. 检查 Wi-Fi 状态 (dumpsys)
-        wifi_dump = self.run_cmd(["shell", "dumpsys", "wifi"])
-        if wifi_dump and "Wi-Fi is enabled" in wifi_dump:
-            # 进一步检查是否连接
-            # 不同安卓版本输出不同，检查 wlan0 是否有 IP 更靠谱
-            pass
-
-        # 3. 检查网卡 IP (ip -o -4 addr show)
+        # 1. 检查网卡 IP (ip -o -4 addr show)
         # 输出示例: 20: wlan0    inet 192.168.1.5/24 ...
-        ip_info = self.run_cmd(["shell", "ip", "-o", "-4", "addr", "show", "up"])
-        
-        net_types = []
-        if ip_info:
-            if "wlan" in ip_info:
-                net_types.append("Wi-Fi")
-            if "rmnet" in ip_info or "ccmni" in ip_info:
-                net_types.append("移动数据")
-            if "eth" in ip_info:
-                net_types.append("有线网络")
+        ip_cmd = "ip -o -4 addr show up"
+
+        # 2. 确认是否有网: 监控线程 2 秒内 Ping 过则直接复用结果，否则与 ip 查询合并为一次调用
+        if time.time() - self._last_ping_ts < 2:
+            has_internet = self._last_ping_ok
+            ip_info = self.run_cmd(["shell", ip_cmd], text=False)
+        else:
+            output = self.run_cmd(["shell", f"{self.heartbeat_cmd()}; echo __SEP__; {ip_cmd}"], text=False)
+            ping_res, _, ip_info = (output or b"").partition(b"__SEP__")
+            has_internet = _PING_OK.search(ping_res) is not None
+        return self.describe_network(ip_info, has_internet)
+
+    def describe_network(self, ip_info, has_internet):
+        """根据 ip addr 原始输出 (bytes) 与连通性生成网络类型描述"""
+        # 正则单次扫描识别所有网卡类型
+        found = {_IFACE_TYPES[name] for name in _IFACE_RE.findall(ip_info or b"")}
+        net_types = [t for t in ("Wi-Fi", "移动数据", "有线网络") if t in found]
         
         if not net_types:
              return "无网络连接 (未检测到有效IP)"
@@ -133,21 +378,48 @@ class AdbWorker(QThread):
 
     def get_brand(self):
         """获取手机品牌"""
-        return self.run_cmd(["shell", "getprop", "ro.product.brand"])
+        return self.get_props(self.DEVICE_PROPS)["ro.product.brand"]
 
     def capture_bugreport(self, save_dir):
         """抓取全量日志 (等同于 284 log)"""
         if not os.path.exists(save_dir):
             os.makedirs(save_dir, exist_ok=True)
         
-        # adb bugreport 会生成 zip 文件
         filename = f"bugreport_{int(time.time())}"
         full_path = os.path.join(save_dir, filename)
+        zip_path = full_path + ".zip"
+        device_cmd = [self.adb_path, "-s", self.device_id]
         
         # 注意: bugreport 命令非常耗时 (1-3分钟)
-        # 传递给 bugreport 的参数是文件前缀或目录
-        self.run_cmd(["bugreport", full_path])
-        return full_path + ".zip"
+        # 1. 设备端生成 zip，bugreportz -p 输出进度，最后一行为 OK:<远端路径> 或 FAIL:<原因>
+        remote_path = None
+        proc = subprocess.Popen(device_cmd + ["shell", "bugreportz", "-p"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, startupinfo=self._startupinfo)
+        for line in proc.stdout:
+            line = line.decode("utf-8", errors="replace").strip()
+            if line.startswith("OK:"):
+                remote_path = line[3:]
+        proc.wait()
+        
+        if not remote_path:
+            # 旧设备不支持 bugreportz，回退到 adb bugreport (参数是文件前缀或目录)
+            self.run_cmd(["bugreport", full_path])
+            return zip_path
+        
+        # 2. exec-out 直接将远端 zip 流式写入本地文件，1 MiB 分块拷贝
+        with open(zip_path, "wb") as f:
+            proc = subprocess.Popen(device_cmd + ["exec-out", "cat", remote_path], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, startupinfo=self._startupinfo)
+            shutil.copyfileobj(proc.stdout, f, length=1 << 20)
+            returncode = proc.wait()
+        
+        # 传输失败时保留设备上的文件，避免唯一的完整副本被删除
+        if returncode != 0 or os.path.getsize(zip_path) == 0:
+            raise RuntimeError(f"日志传输失败 (exit {returncode})，设备上的文件保留在: {remote_path}")
+        
+        # 与 adb bugreport 行为一致，拉取后删除设备上的临时文件
+        self.run_cmd(["shell", "rm", "-f", remote_path])
+        return zip_path
 
 class NetworkMonitor(QThread):
     """测试期间持续监控网络连通性及网速"""
@@ -161,54 +433,51 @@ class NetworkMonitor(QThread):
         self.last_rx = 0
         self.last_tx = 0
         self.last_time = 0
+        self.last_speed_text = None
+        # 最近一次检测结果，供其他模块复用，避免重复查询
+        self.latest_status = {}
 
     def get_traffic_stats(self):
         """读取 /proc/net/dev 获取总流量"""
-        output = self.adb_worker.run_cmd(["shell", "cat", "/proc/net/dev"])
+        output = self.adb_worker.run_cmd(["shell", "cat", "/proc/net/dev"], text=False)
+        return self.parse_traffic_stats(output)
+
+    def parse_traffic_stats(self, output):
+        """解析 /proc/net/dev 原始输出 (bytes)，返回 (总接收, 总发送) 字节数"""
         if not output: return 0, 0
         
         total_rx = 0
         total_tx = 0
         
-        # 解析每一行，累加所有网卡的流量 (忽略 lo)
-        for line in output.split('\n'):
-            if ":" in line:
-                parts = line.split(":")
-                iface = parts[0].strip()
-                if iface == "lo": continue
-                
-                # 数据部分可能有很多空格，用 split() 自动处理
-                data = parts[1].split()
-                if len(data) >= 9:
-                    try:
-                        rx = int(data[0]) # Receive bytes
-                        tx = int(data[8]) # Transmit bytes
-                        total_rx += rx
-                        total_tx += tx
-                    except:
-                        pass
+        # 正则一次扫描所有数据行，累加所有网卡的流量 (忽略 lo)
+        # 网卡可能随时切换 (Wi-Fi/移动数据/464xlat 等)，因此不做筛选或提前结束
+        for m in _NETDEV_RE.finditer(output):
+            iface, rx, tx = m.groups()
+            if iface != b"lo":
+                total_rx += int(rx)
+                total_tx += int(tx)
         return total_rx, total_tx
 
     def run(self):
         self.running = True
-        # 初始化流量基数
-        self.last_rx, self.last_tx = self.get_traffic_stats()
-        self.last_time = time.time()
+        # 初始化流量基数 (刚做过快照或刚暂停时直接复用，不再重复读取)
+        if time.time() - self.last_time > 5:
+            self.last_rx, self.last_tx = self.get_traffic_stats()
+            self.last_time = time.time()
+        self.last_speed_text = None
         
         while self.running:
-            # 1. 连通性检查 (Ping)
-            cmd = ["shell", "ping", "-c", "1", "-w", "1", "223.5.5.5"]
-            result = self.adb_worker.run_cmd(cmd)
+            # 1. 连通性检查 (TCP/Ping)，同一次 shell 调用中顺带读取流量
+            ping_ok, current_rx, current_tx = self.probe()
             
-            if not result or "1 packets transmitted, 1 received" not in result:
+            if not ping_ok:
                 time.sleep(0.5)
-                result_retry = self.adb_worker.run_cmd(cmd)
-                if not result_retry or "1 packets transmitted, 1 received" not in result_retry:
-                    self.error_signal.emit("网络连接断开！Ping 丢包。")
+                ping_ok, current_rx, current_tx = self.probe()
+                if not ping_ok:
+                    self.error_signal.emit("网络连接断开！连通性检测失败。")
                     break
             
             # 2. 网速计算
-            current_rx, current_tx = self.get_traffic_stats()
             current_time = time.time()
             
             duration = current_time - self.last_time
@@ -221,7 +490,11 @@ class NetworkMonitor(QThread):
                 rx_str = self.format_speed(rx_speed)
                 tx_str = self.format_speed(tx_speed)
                 
-                self.speed_signal.emit(f"⬇️ {rx_str}   ⬆️ {tx_str}")
+                # 显示内容未变化时不发信号，省去一次标签重绘
+                speed_text = f"⬇️ {rx_str}   ⬆️ {tx_str}"
+                if speed_text != self.last_speed_text:
+                    self.last_speed_text = speed_text
+                    self.speed_signal.emit(speed_text)
                 
                 self.last_rx = current_rx
                 self.last_tx = current_tx
@@ -229,13 +502,50 @@ class NetworkMonitor(QThread):
             
             time.sleep(1) 
 
+    def probe(self, with_ifaces=False):
+        """连通性检测与 /proc/net/dev (可选 ip addr) 合并为一次 shell 调用，返回 (是否连通, 总接收, 总发送)"""
+        script = f"{self.adb_worker.heartbeat_cmd()}; echo __SEP__; cat /proc/net/dev"
+        if with_ifaces:
+            script += "; echo __SEP__; ip -o -4 addr show up"
+        output = self.adb_worker.run_cmd(["shell", script], text=False)
+        if not output: return False, 0, 0
+        
+        ping_res, _, rest = output.partition(b"__SEP__")
+        net_dev, _, ip_info = rest.partition(b"__SEP__")
+        ping_ok = _PING_OK.search(ping_res) is not None
+        self.adb_worker.record_ping(ping_ok)
+        total_rx, total_tx = self.parse_traffic_stats(net_dev)
+        
+        self.latest_status.update(ping_ok=ping_ok, rx=total_rx, tx=total_tx, time=time.time())
+        if with_ifaces:
+            self.latest_status["net_type"] = self.adb_worker.describe_network(ip_info, ping_ok)
+        return ping_ok, total_rx, total_tx
+
+    def get_initial_snapshot(self):
+        """在调用方线程执行一次完整检测 (含网络类型)，同时作为下次监控的流量基数"""
+        # 测试中点击"重新开始"时监控线程仍在运行，不能改动它正在使用的状态与流量基数
+        monitoring = self.isRunning()
+        if monitoring:
+            self.latest_status.pop("net_type", None)
+        else:
+            self.latest_status.clear()
+        _, total_rx, total_tx = self.probe(with_ifaces=True)
+        if "net_type" not in self.latest_status:
+            # 检测失败时返回空字典而不是上一次的数据
+            return {}
+        if not monitoring:
+            self.last_rx, self.last_tx = total_rx, total_tx
+            self.last_time = time.time()
+        return dict(self.latest_status)
+
     def format_speed(self, bytes_per_sec):
+        # 阈值与倒数均为常量 (1024 / 1024*1024)，乘以倒数代替除法
         if bytes_per_sec < 1024:
             return f"{bytes_per_sec:.0f} B/s"
-        elif bytes_per_sec < 1024 * 1024:
-            return f"{bytes_per_sec/1024:.1f} KB/s"
+        elif bytes_per_sec < 1048576:
+            return f"{bytes_per_sec * (1 / 1024):.1f} KB/s"
         else:
-            return f"{bytes_per_sec/(1024*1024):.2f} MB/s"
+            return f"{bytes_per_sec * (1 / 1048576):.2f} MB/s"
 
     def stop(self):
         self.running = False
@@ -253,19 +563,14 @@ class BugReportThread(QThread):
         try:
             # 1. 获取型号构建目录名
             date_str = time.strftime("%Y-%m-%d")
-            model = self.adb_worker.run_cmd(["shell", "getprop", "ro.product.model"])
+            model = self.adb_worker.get_props(AdbWorker.DEVICE_PROPS)["ro.product.model"]
             if not model: model = "Unknown"
             model = model.strip().replace(" ", "_")
             
             dir_name = f"{date_str}-{model}-NetworkError"
             
             # 2. 确定保存路径 (当前 exe 同级目录)
-            if getattr(sys, 'frozen', False):
-                base_path = os.path.dirname(sys.executable)
-            else:
-                base_path = os.getcwd()
-                
-            save_dir = os.path.join(base_path, dir_name)
+            save_dir = os.path.join(_base_path(), dir_name)
             
             # 3. 执行抓取
             self.adb_worker.capture_bugreport(save_dir)
@@ -274,6 +579,22 @@ class BugReportThread(QThread):
         except Exception as e:
             self.finished_signal.emit("", str(e))
 
+class DeviceInfoWorker(QThread):
+    """后台读取设备型号与网络类型，避免阻塞 UI"""
+    info_ready = pyqtSignal(str, str) # dev_info, net_type
+
+    def __init__(self, adb_worker, net_monitor):
+        super().__init__()
+        self.adb_worker = adb_worker
+        self.net_monitor = net_monitor
+
+    def run(self):
+        dev_info = self.adb_worker.get_device_info()
+        # 网络类型取自监控线程的首次检测，同时为监控播下流量基数
+        snapshot = self.net_monitor.get_initial_snapshot()
+        net_type = snapshot.get("net_type", "无网络连接 (未检测到有效IP)")
+        self.info_ready.emit(dev_info, net_type)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -286,6 +607,9 @@ class MainWindow(QMainWindow):
         self.remaining_time = 30
         self.is_testing = False
         self.has_triggered_bugreport = False # 防止重复触发日志抓取
+        self.pending_start = False # 正在后台读取环境信息，等待启动测试
+        self.info_thread = None
+        self.restart_was_enabled = False
         
         # UI 组件初始化
         self.setup_ui()
@@ -293,6 +617,7 @@ class MainWindow(QMainWindow):
         # 后台线程
         self.adb_thread = AdbWorker()
         self.adb_thread.device_status_signal.connect(self.update_device_status)
+        self.adb_thread.detail_signal.connect(self.update_device_details)
         self.adb_thread.start()
 
         self.net_monitor = NetworkMonitor(self.adb_thread)
@@ -302,9 +627,6 @@ class MainWindow(QMainWindow):
         # 定时器
         self.timer = QTimer()
         self.timer.timeout.connect(self.on_timer_tick)
-        
-        self.swipe_timer = QTimer()
-        self.swipe_timer.timeout.connect(self.do_swipe)
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -425,20 +747,19 @@ class MainWindow(QMainWindow):
         self.lbl_device_info.setStyleSheet(f"color: {color}; font-weight: bold;")
         
         if connected and not self.is_testing:
-            # 设备连接后，尝试获取更多信息
-            threading.Thread(target=self._fetch_details).start()
+            # 详细信息由 AdbWorker 获取后通过 detail_signal 回传
             self.btn_start.setEnabled(True)
         elif not connected:
+            self.pending_start = False
             self.lbl_net_info.setText("等待设备...")
             self.btn_start.setEnabled(False)
             self.btn_restart.setEnabled(False)
 
-    def _fetch_details(self):
-        """异步获取详细信息"""
-        info = self.adb_thread.get_device_info()
-        net_type = self.adb_thread.get_network_type()
-        # 实际应用中建议使用信号回传更新UI，此处简化处理
-        pass
+    def update_device_details(self, info, net_type):
+        """显示设备连接后获取到的详细信息"""
+        if self.is_testing: return
+        self.lbl_device_info.setText(info)
+        self.lbl_net_info.setText(net_type)
 
     def reset_start_button(self):
         """当时间设置变更时，重置为开始状态"""
@@ -470,13 +791,27 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请设置有效的执行时间")
             return
 
-        # 2. 获取并显示当前环境信息
+        # 2. 后台获取当前环境信息，完成后在 on_device_info_ready 中继续
         self.lbl_device_info.setText("正在读取信息...")
         self.lbl_net_info.setText("正在分析网络...")
-        QApplication.processEvents() # 刷新UI
+        self.pending_start = True
+        self.restart_was_enabled = self.btn_restart.isEnabled()
+        self.btn_start.setEnabled(False)
+        self.btn_restart.setEnabled(False)
         
-        dev_info = self.adb_thread.get_device_info()
-        net_type = self.adb_thread.get_network_type()
+        # 上一次读取仍在进行时直接等待其结果，不能替换 (销毁) 运行中的线程
+        if self.info_thread is not None and self.info_thread.isRunning():
+            return
+        self.info_thread = DeviceInfoWorker(self.adb_thread, self.net_monitor)
+        self.info_thread.info_ready.connect(self.on_device_info_ready)
+        self.info_thread.start()
+
+    def on_device_info_ready(self, dev_info, net_type):
+        """环境信息读取完成回调，继续启动测试"""
+        # 读取期间设备已断开或用户已停止，则不再启动
+        if not self.pending_start or not self.adb_thread.device_id:
+            self.cancel_pending_start()
+            return
         
         self.lbl_device_info.setText(dev_info)
         self.lbl_net_info.setText(net_type)
@@ -484,10 +819,13 @@ class MainWindow(QMainWindow):
         if "无默认路由" in net_type:
             reply = QMessageBox.question(self, "网络警告", f"当前检测网络为: {net_type}\n可能无法正常测试，是否继续？", 
                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.No:
+            if (reply == QMessageBox.StandardButton.No
+                    or not self.pending_start or not self.adb_thread.device_id):
+                self.cancel_pending_start()
                 return
 
         # 3. 初始化状态
+        self.pending_start = False
         self.is_testing = True
         self.remaining_time = self.test_duration
         self.progress.setRange(0, self.test_duration)
@@ -499,7 +837,14 @@ class MainWindow(QMainWindow):
         # 4. 启动监控和定时器
         self.net_monitor.start()
         self.timer.start(1000)
-        self.swipe_timer.start(2000)
+        self.adb_thread.start_swipe_loop()
+
+    def cancel_pending_start(self):
+        """放弃本次启动，恢复按钮状态"""
+        self.pending_start = False
+        connected = bool(self.adb_thread.device_id)
+        self.btn_start.setEnabled(connected and not self.is_testing)
+        self.btn_restart.setEnabled(connected and (self.is_testing or self.restart_was_enabled))
 
     def resume_test(self):
         """继续测试"""
@@ -508,7 +853,7 @@ class MainWindow(QMainWindow):
         
         self.net_monitor.start()
         self.timer.start(1000)
-        self.swipe_timer.start(2000)
+        self.adb_thread.start_swipe_loop()
 
     def enable_testing_ui(self):
         """设置测试运行时的UI状态"""
@@ -578,19 +923,14 @@ class MainWindow(QMainWindow):
         h, m = divmod(m, 60)
         self.lbl_timer.setText(f"{h:02d}:{m:02d}:{s:02d}")
 
-    def do_swipe(self):
-        threading.Thread(target=self._swipe_thread).start()
-
-    def _swipe_thread(self):
-        self.adb_thread.run_cmd(["shell", "input", "swipe", "500", "1500", "500", "500", "200"])
-
     def stop_test_manual(self):
         self.stop_test_internal(is_pause=True)
 
     def stop_test_internal(self, is_pause=False):
         self.is_testing = False
+        self.pending_start = False
         self.timer.stop()
-        self.swipe_timer.stop()
+        self.adb_thread.stop_swipe_loop()
         self.net_monitor.stop()
         
         self.btn_start.setEnabled(True)
@@ -610,6 +950,12 @@ class MainWindow(QMainWindow):
         self.lbl_timer.setText("00:00:00")
         QMessageBox.information(self, "测试完成", "✅ 指定时间的自动化测试已顺利完成。\n期间网络连接保持正常。")
 
+    def closeEvent(self, event):
+        """关闭窗口时结束测试 (含设备端滑动循环) 并停止后台 ADB 线程"""
+        self.stop_test_internal(is_pause=False)
+        self.adb_thread.stop()
+        event.accept()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()